@@ -1,21 +1,83 @@
 #!/usr/bin/env python3
 from flask import Flask, request, jsonify, send_from_directory, Response, stream_with_context
+from flask.json.provider import JSONProvider
 import subprocess
 import os
+import functools
 import json
 import logging
 import time
 import threading
 import queue
+import collections
 import re
+import shlex
+import selectors
+import itertools
+import urllib.request
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Tuple, Deque
 from datetime import datetime
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def _json_default(obj):
+    """Serialize values the JSON encoder doesn't handle natively"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+if HAS_ORJSON:
+    def json_dumps(obj, indent=False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option, default=_json_default)
+
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj, indent=False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=_json_default).encode()
+
+    json_loads = json.loads
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson when available (stdlib json otherwise)"""
+
+    def dumps(self, obj, **kwargs):
+        return json_dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return json_loads(s)
+
+    def response(self, *args, **kwargs):
+        # Build the body as bytes directly instead of dumps() -> str -> encode
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(json_dumps(obj), mimetype='application/json')
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SSE comment frame - ignored by clients, keeps proxies from closing idle streams
+KEEPALIVE = b": keepalive\n\n"
+# Headers for SSE responses - no caching, no proxy (nginx) response buffering
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'
+}
+# Max log entries kept per deployment; older entries are dropped from replay
+MAX_LOG_ENTRIES = 10000
+# Max seconds a log subscriber waits for new entries before sending a keepalive
+LOG_WAIT_TIMEOUT = 15
+
+def sse_frame(payload: dict) -> bytes:
+    """Encode a payload as a complete SSE data frame"""
+    return b"data: " + json_dumps(payload) + b"\n\n"
+
 # Global deployment state - singleton tracker for the current/last deployment
 @dataclass
 class DeploymentState:
@@ -24,8 +86,13 @@ class DeploymentState:
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     status: str = "idle"  # idle, running, success, failed, timeout
-    logs: List[dict] = field(default_factory=list)
+    logs: Deque[bytes] = field(default_factory=lambda: collections.deque(maxlen=MAX_LOG_ENTRIES))  # encoded SSE frames
+    next_seq: int = 0  # SSE event id of the next log entry; never reset, so ids stay unique
     lock: threading.Lock = field(default_factory=threading.Lock)
+    cond: threading.Condition = field(init=False)  # notified on new logs and on finish
+    
+    def __post_init__(self):
+        self.cond = threading.Condition(self.lock)
     
     def start(self):
         with self.lock:
@@ -33,66 +100,147 @@ class DeploymentState:
             self.started_at = datetime.now()
             self.finished_at = None
             self.status = "running"
-            self.logs = []
+            self.logs.clear()
     
-    def add_log(self, log_entry: dict):
+    def add_log(self, log_entry: dict) -> bytes:
+        """Store a log entry and return its SSE frame, encoded once for all subscribers"""
+        data = sse_frame(log_entry)
         with self.lock:
-            self.logs.append(log_entry)
+            frame = b"id: %d\n" % self.next_seq + data
+            self.next_seq += 1
+            self.logs.append(frame)
+            self.cond.notify_all()
+        return frame
     
     def finish(self, status: str):
         with self.lock:
             self.is_running = False
             self.finished_at = datetime.now()
             self.status = status
+            self.cond.notify_all()
     
-    def get_logs(self) -> List[dict]:
-        with self.lock:
-            return list(self.logs)
+    def _frames_from(self, seq: int) -> List[bytes]:
+        # Caller holds the lock. Entries older than the retained window are skipped.
+        first_seq = self.next_seq - len(self.logs)
+        return list(itertools.islice(self.logs, max(seq - first_seq, 0), None))
+    
+    def wait_for_logs(self, seq: int, timeout: float) -> Tuple[List[bytes], int, bool]:
+        """
+        Block until there are logs with id >= seq or the deployment is no longer running.
+        Returns the new frames, the id to resume from, and whether the deployment is still running.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.next_seq > seq or not self.is_running, timeout=timeout)
+            return self._frames_from(seq), self.next_seq, self.is_running
     
     def get_status(self) -> dict:
         with self.lock:
             return {
                 "is_running": self.is_running,
                 "status": self.status,
-                "started_at": self.started_at.isoformat() if self.started_at else None,
-                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
                 "log_count": len(self.logs)
             }
 
 # Global singleton
 deployment_state = DeploymentState()
 
+def follow_logs(seq: int = 0):
+    """Yield stored log frames from event id seq, then live frames until the deployment finishes"""
+    while True:
+        frames, seq, running = deployment_state.wait_for_logs(seq, LOG_WAIT_TIMEOUT)
+        if frames:
+            yield from frames
+        elif running:
+            # Woke up on timeout with nothing new
+            yield KEEPALIVE
+        if not running:
+            return
+
 # Persistent deployment state file
 STATE_FILE = os.environ.get('STATE_FILE', '/app/data/deployment.state')
+# Saves issued within this window (seconds) are coalesced into a single write
+STATE_SAVE_DELAY = 0.2
+
+# Latest unsaved state and the timer that will flush it; guarded by _state_lock.
+# _state_write_lock serializes disk writes/removal so readers never wait on I/O.
+_state_lock = threading.Lock()
+_state_write_lock = threading.Lock()
+_pending_state = None
+_state_timer = None
 
 def get_persistent_state() -> dict:
-    """Read persistent deployment state from file"""
+    """Read persistent deployment state (a pending unsaved state takes precedence over the file)"""
+    with _state_lock:
+        if _pending_state is not None:
+            return _pending_state
     try:
         if os.path.exists(STATE_FILE):
-            with open(STATE_FILE, 'r') as f:
-                return json.load(f)
+            with open(STATE_FILE, 'rb') as f:
+                return json_loads(f.read())
     except Exception as e:
         logger.error(f"Failed to read state file: {e}")
     return {"deployed": False}
 
+def _write_state_file(state: dict):
+    """Atomically replace the state file: write a temp file, fsync, then rename over"""
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = STATE_FILE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(json_dumps(state, indent=True))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, STATE_FILE)
+
+def _flush_persistent_state():
+    """Write the pending state, if any (runs on the debounce timer)"""
+    global _pending_state, _state_timer
+    with _state_lock:
+        state, _state_timer = _pending_state, None
+    if state is None:
+        return
+    with _state_write_lock:
+        with _state_lock:
+            if _pending_state is not state:
+                return  # superseded by a newer save (its own timer writes it) or cleared
+        try:
+            _write_state_file(state)
+            logger.info(f"State saved: {state.get('status', 'unknown')}")
+        except Exception as e:
+            logger.error(f"Failed to write state file: {e}")
+    with _state_lock:
+        if _pending_state is state:
+            _pending_state = None
+
 def save_persistent_state(state: dict):
-    """Write persistent deployment state to file"""
-    try:
-        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
-        with open(STATE_FILE, 'w') as f:
-            json.dump(state, f, indent=2, default=str)
-        logger.info(f"State saved: {state.get('status', 'unknown')}")
-    except Exception as e:
-        logger.error(f"Failed to write state file: {e}")
+    """
+    Write persistent deployment state to file.
+    The write is deferred by STATE_SAVE_DELAY so back-to-back saves result in
+    one atomic replace of the file; readers see the new state immediately.
+    """
+    global _pending_state, _state_timer
+    with _state_lock:
+        _pending_state = state
+        if _state_timer is None:
+            _state_timer = threading.Timer(STATE_SAVE_DELAY, _flush_persistent_state)
+            _state_timer.start()
 
 def clear_persistent_state():
     """Remove persistent state file"""
-    try:
-        if os.path.exists(STATE_FILE):
-            os.remove(STATE_FILE)
-            logger.info("State file cleared")
-    except Exception as e:
-        logger.error(f"Failed to clear state file: {e}")
+    global _pending_state, _state_timer
+    with _state_lock:
+        if _state_timer is not None:
+            _state_timer.cancel()
+            _state_timer = None
+        _pending_state = None
+    with _state_write_lock:
+        try:
+            if os.path.exists(STATE_FILE):
+                os.remove(STATE_FILE)
+                logger.info("State file cleared")
+        except Exception as e:
+            logger.error(f"Failed to clear state file: {e}")
 
 # Load configuration
 # Use local paths as default, Docker paths as fallback
@@ -111,11 +259,24 @@ def get_help_path():
 CONFIG_FILE = os.environ.get('CONFIG_FILE') or get_config_path()
 HELP_CONTENT_FILE = os.environ.get('HELP_CONTENT_FILE') or get_help_path()
 
+# Parsed JSON files: path -> (st_mtime_ns, data)
+_json_file_cache = {}
+
+def load_json_file(path):
+    """Parse a JSON file, reusing the previous result while its mtime is unchanged"""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _json_file_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'rb') as f:
+        data = json_loads(f.read())
+    _json_file_cache[path] = (mtime, data)
+    return data
+
 def load_config():
     """Load configuration from JSON file"""
     try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+        return load_json_file(CONFIG_FILE)
     except Exception as e:
         logger.error(f"Failed to load config: {e}")
         return {
@@ -134,8 +295,7 @@ def load_config():
 def load_help_content():
     """Load help content from JSON file"""
     try:
-        with open(HELP_CONTENT_FILE, 'r') as f:
-            return json.load(f)
+        return load_json_file(HELP_CONTENT_FILE)
     except Exception as e:
         logger.warning(f"Failed to load help content: {e}")
         return {
@@ -148,26 +308,31 @@ def load_help_content():
             ]
         }
 
+@functools.lru_cache(maxsize=1)
+def _lookup_public_ip():
+    """
+    Fetch the public IP from icanhazip.com.
+    Raises on failure so that only successful lookups are cached - the host IP
+    doesn't change for the lifetime of the process.
+    """
+    with urllib.request.urlopen("http://icanhazip.com", timeout=5) as resp:
+        ip = resp.read().decode().strip()
+    if not ip:
+        raise ValueError("empty response from icanhazip.com")
+    logger.info(f"Derived HOST_IP: {ip}")
+    return ip
+
 def get_host_ip():
     """Get public IP address of the host"""
     try:
-        result = subprocess.run(
-            ["curl", "-s", "--max-time", "5", "icanhazip.com"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        if result.returncode == 0 and result.stdout.strip():
-            ip = result.stdout.strip()
-            logger.info(f"Derived HOST_IP: {ip}")
-            return ip
-        else:
-            logger.warning("Failed to get public IP from icanhazip.com")
-            return None
+        return _lookup_public_ip()
     except Exception as e:
-        logger.error(f"Error getting host IP: {e}")
+        logger.warning(f"Failed to get public IP from icanhazip.com: {e}")
         return None
 
+# Optional digits followed by hyphen, then the rest of the host (see extract_base_domain)
+_BASE_DOMAIN_RE = re.compile(r'([0-9]*-[^.]+\..+)$')
+
 def extract_base_domain(host_header):
     """
     Extract base domain suffix from Host header.
@@ -185,10 +350,9 @@ def extract_base_domain(host_header):
         host = host_header.split(':')[0]
         
         # Find the first hyphen and extract everything from any digits before it
-        # Pattern: optional digits followed by hyphen, then the rest
         # e.g., 'interlude0-uplcf60xo.brevlab.com' -> '0-uplcf60xo.brevlab.com'
         # e.g., 'studio-lccpkmz8f.brevlab.com' -> '-lccpkmz8f.brevlab.com'
-        match = re.search(r'([0-9]*-[^.]+\..+)$', host)
+        match = _BASE_DOMAIN_RE.search(host)
         if match:
             base_domain = match.group(1)
             logger.info(f"Extracted BASE_DOMAIN: {base_domain} from {host}")
@@ -200,30 +364,40 @@ def extract_base_domain(host_header):
         logger.error(f"Error extracting base domain: {e}")
         return None
 
+# ${VAR} placeholders supported in service URLs
+_URL_VAR_RE = re.compile(r'\$\{(HOST_IP|BASE_DOMAIN)\}')
+
 def substitute_service_urls(services, host_ip=None, base_domain=None):
     """
     Substitute ${HOST_IP} and ${BASE_DOMAIN} variables in service URLs.
+    Variables without a value are left in place.
     Returns a new list with substituted URLs.
     """
     if not services:
         return []
     
-    substituted = []
-    for service in services:
-        new_service = service.copy()
-        url_template = service.get('url', '')
-        
-        # Perform substitutions
-        url = url_template
-        if host_ip:
-            url = url.replace('${HOST_IP}', host_ip)
-        if base_domain:
-            url = url.replace('${BASE_DOMAIN}', base_domain)
-        
-        new_service['url'] = url
-        substituted.append(new_service)
+    mapping = {'HOST_IP': host_ip, 'BASE_DOMAIN': base_domain}
+    
+    def replace(match):
+        return mapping[match.group(1)] or match.group(0)
+    
+    def substitute(url):
+        # Single pass over the URL; skip the regex entirely when there are no placeholders
+        return _URL_VAR_RE.sub(replace, url) if '${' in url else url
     
-    return substituted
+    return [{**service, 'url': substitute(service.get('url', ''))} for service in services]
+
+# Only write specific env vars that docker-compose needs:
+# input field env vars and deployment-specific vars
+ENV_FILE_VARS = frozenset({
+    'NVIDIA_API_KEY',
+    'ELEVENLABS_API_KEY',
+    'VERSION',
+    'REACHY_SCENE',
+    'RESOLUTION',
+    'NVIDIA_DRIVER_CAPABILITIES',
+    'NVIDIA_VISIBLE_DEVICES'
+})
 
 def write_env_file(env_vars, working_dir='.'):
     """
@@ -244,26 +418,16 @@ def write_env_file(env_vars, working_dir='.'):
     env_file_path = os.path.join(working_dir, '.env')
     
     try:
-        # Only write specific env vars that docker-compose needs
-        # Filter to input field env vars and deployment-specific vars
-        allowed_vars = [
-            'NVIDIA_API_KEY',
-            'ELEVENLABS_API_KEY',
-            'VERSION',
-            'REACHY_SCENE',
-            'RESOLUTION',
-            'NVIDIA_DRIVER_CAPABILITIES',
-            'NVIDIA_VISIBLE_DEVICES'
+        lines = [
+            "# Auto-generated by deployment launcher\n",
+            "# DO NOT COMMIT THIS FILE\n",
+            f"# Created: {datetime.now().isoformat()}\n\n"
         ]
+        lines += [f"{key}={value}\n" for key, value in env_vars.items() if key in ENV_FILE_VARS and value]
         
-        with open(env_file_path, 'w') as f:
-            f.write("# Auto-generated by deployment launcher\n")
-            f.write("# DO NOT COMMIT THIS FILE\n")
-            f.write(f"# Created: {datetime.now().isoformat()}\n\n")
-            
-            for key in allowed_vars:
-                if key in env_vars and env_vars[key]:
-                    f.write(f"{key}={env_vars[key]}\n")
+        # Single write of the whole file
+        with open(env_file_path, 'wb') as f:
+            f.write("".join(lines).encode())
         
         # Secure the file - owner read/write only (600)
         os.chmod(env_file_path, 0o600)
@@ -295,9 +459,11 @@ def cleanup_env_file(working_dir='.'):
         logger.error(f"✗ Failed to remove .env file: {e}")
         return False
 
+@functools.lru_cache(maxsize=1)
 def get_docker_compose_command():
     """
     Detect which docker compose command is available.
+    Detection runs once; the result is cached for the process lifetime.
     
     Returns: 'docker compose' (V2) or 'docker-compose' (V1) or None
     """
@@ -349,15 +515,88 @@ def normalize_docker_compose_command(command):
     
     return command
 
+# Shell syntax that needs /bin/sh: operators, redirects, expansions, globs,
+# comments, or a leading VAR=value assignment
+_SHELL_SYNTAX_RE = re.compile(r'[|&;<>()$`*?\[\]{}~#\n]|^\s*\w+=')
+# Builtins and keywords that only exist inside a shell - never exec'd directly
+_SHELL_BUILTINS = frozenset({
+    '.', ':', 'alias', 'break', 'case', 'cd', 'continue', 'eval', 'exec', 'exit',
+    'export', 'for', 'if', 'read', 'readonly', 'return', 'set', 'shift', 'source',
+    'trap', 'ulimit', 'umask', 'unalias', 'unset', 'until', 'wait', 'while'
+})
+
+@functools.lru_cache(maxsize=256)
+def split_command(command):
+    """
+    Return (args, shell) for Popen.
+    Plain commands are split with shlex and exec'd directly, avoiding a /bin/sh
+    fork per command; anything using shell syntax is passed to the shell as-is.
+    """
+    if _SHELL_SYNTAX_RE.search(command):
+        return command, True
+    try:
+        args = shlex.split(command)
+    except ValueError:
+        return command, True
+    if not args or args[0] in _SHELL_BUILTINS:
+        return command, True
+    return tuple(args), False
+
+# Bytes requested per os.read() when draining a child's output pipe
+READ_CHUNK_SIZE = 1 << 16
+
+def iter_output_batches(process, raw=None):
+    """
+    Yield lists of decoded output lines (without trailing newline) from a Popen
+    started with stdout=PIPE in binary mode, one list per read.
+    
+    The pipe is switched to non-blocking and drained in 64 KiB blocks through a
+    selector, splitting lines in bulk instead of one readline() call per line.
+    Like text-mode pipes, '\r\n', '\r' and '\n' all end a line, so '\r'
+    progress updates arrive as separate lines.
+    If raw is a bytearray, every chunk read is also appended to it.
+    """
+    fd = process.stdout.fileno()
+    os.set_blocking(fd, False)
+    pending = bytearray()
+    with selectors.DefaultSelector() as sel:
+        sel.register(fd, selectors.EVENT_READ)
+        while True:
+            sel.select()
+            try:
+                chunk = os.read(fd, READ_CHUNK_SIZE)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                break  # EOF - child closed its end of the pipe
+            if raw is not None:
+                raw += chunk
+            pending += chunk
+            # A trailing '\r' may be the first half of '\r\n' - keep it for the next read
+            scan_end = len(pending) - 1 if pending.endswith(b'\r') else len(pending)
+            end = max(pending.rfind(b'\n', 0, scan_end), pending.rfind(b'\r', 0, scan_end))
+            if end < 0:
+                continue
+            yield [line.decode('utf-8', 'replace') for line in pending[:end + 1].splitlines()]
+            del pending[:end + 1]
+    if pending:
+        yield [line.decode('utf-8', 'replace') for line in pending.splitlines()]
+
+def iter_output_lines(process, raw=None):
+    """Yield decoded output lines from a Popen one at a time (see iter_output_batches)"""
+    for batch in iter_output_batches(process, raw):
+        yield from batch
+
 def execute_command(command, working_dir, env, timeout=300, stream_queue=None):
     """Execute a shell command and return result, optionally streaming output"""
     logger.info(f"Executing: {command}")
+    args, shell = split_command(command)
 
     if stream_queue is None:
         # Original behavior - capture all output
         result = subprocess.run(
-            command,
-            shell=True,
+            args,
+            shell=shell,
             cwd=working_dir,
             env=env,
             capture_output=True,
@@ -368,23 +607,19 @@ def execute_command(command, working_dir, env, timeout=300, stream_queue=None):
 
     # Stream output line by line
     process = subprocess.Popen(
-        command,
-        shell=True,
+        args,
+        shell=shell,
         cwd=working_dir,
         env=env,
         stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-        bufsize=1
+        stderr=subprocess.STDOUT
     )
 
-    output_lines = []
+    output = bytearray()
     try:
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                output_lines.append(line)
-                if stream_queue:
-                    stream_queue.put(('output', line.rstrip()))
+        for line in iter_output_lines(process, output):
+            if stream_queue:
+                stream_queue.put(('output', line.rstrip()))
 
         process.wait(timeout=timeout)
 
@@ -395,7 +630,7 @@ def execute_command(command, working_dir, env, timeout=300, stream_queue=None):
                 self.stdout = stdout
                 self.stderr = ''
 
-        return Result(process.returncode, ''.join(output_lines))
+        return Result(process.returncode, output.decode('utf-8', 'replace'))
 
     except subprocess.TimeoutExpired:
         process.kill()
@@ -484,68 +719,87 @@ def deploy_status():
 @app.route('/deploy/logs', methods=['GET'])
 def deploy_logs():
     """Stream existing logs and continue with live updates if deployment is running"""
+    # Reconnecting clients resume after the last event they saw
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    start_seq = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+    if start_seq > deployment_state.next_seq:
+        # Id from before a restart (the counter began again at 0) - replay everything
+        start_seq = 0
+
     def generate():
-        # First, replay all existing logs
-        existing_logs = deployment_state.get_logs()
-        last_index = len(existing_logs)
-        
-        for log_entry in existing_logs:
-            yield f"data: {json.dumps(log_entry)}\n\n"
-        
-        # If deployment is still running, continue streaming new logs
-        while deployment_state.is_running:
-            yield ": keepalive\n\n"
-            time.sleep(1)
-            
-            # Check for new logs
-            current_logs = deployment_state.get_logs()
-            if len(current_logs) > last_index:
-                for log_entry in current_logs[last_index:]:
-                    yield f"data: {json.dumps(log_entry)}\n\n"
-                last_index = len(current_logs)
-        
-        # Send any final logs that came in
-        final_logs = deployment_state.get_logs()
-        if len(final_logs) > last_index:
-            for log_entry in final_logs[last_index:]:
-                yield f"data: {json.dumps(log_entry)}\n\n"
+        # Replay existing logs, then continue with live updates while running
+        yield from follow_logs(start_seq)
         
         # Signal completion
-        yield f"data: {json.dumps({'type': 'stream_end', 'status': deployment_state.status})}\n\n"
+        yield sse_frame({'type': 'stream_end', 'status': deployment_state.status})
     
-    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Frames are pre-encoded bytes, so hand them to the server as-is
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS,
+        direct_passthrough=True
+    )
 
 def run_command_async(command, working_dir, env, result_holder, output_queue):
-    """Run a command in a thread, putting output lines in queue"""
+    """
+    Run a command in a thread. Each output line is recorded in deployment_state
+    and its encoded SSE frame is put in output_queue for the streaming response.
+    """
     try:
+        args, shell = split_command(command)
         process = subprocess.Popen(
-            command,
-            shell=True,
+            args,
+            shell=shell,
             cwd=working_dir,
             env=env,
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            stderr=subprocess.STDOUT
         )
         
-        output_lines = []
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                output_lines.append(line)
-                output_queue.put(('output', line.rstrip()))
+        output = bytearray()
+        for line in iter_output_lines(process, output):
+            output_queue.put(deployment_state.add_log({'type': 'output', 'message': line.rstrip()}))
         
         process.wait()
         process.stdout.close()
         
         result_holder['returncode'] = process.returncode
-        result_holder['stdout'] = ''.join(output_lines)
+        result_holder['stdout'] = output.decode('utf-8', 'replace')
         result_holder['done'] = True
     except Exception as e:
         result_holder['returncode'] = 1
         result_holder['stdout'] = str(e)
         result_holder['done'] = True
-        output_queue.put(('error', f'Command error: {str(e)}'))
+        output_queue.put(deployment_state.add_log({'type': 'error', 'message': f'Command error: {str(e)}'}))
+
+def watch_pods_async(process, output_queue):
+    """
+    Read a `kubectl get pods -w --output-watch-events` stream in a thread.
+    After each batch of updates, record a snapshot of the current pods and
+    queue its SSE frames.
+    """
+    pods = {}  # pod name -> status line, in the order pods first appeared
+    try:
+        for batch in iter_output_batches(process):
+            changed = False
+            for line in batch:
+                # Lines are "EVENT NAME READY STATUS ..."
+                parts = line.split(None, 2)
+                if len(parts) < 2:
+                    continue
+                event, name = parts[0], parts[1]
+                if event == 'DELETED':
+                    pods.pop(name, None)
+                else:
+                    pods[name] = line.split(None, 1)[1]
+                changed = True
+            if changed:
+                output_queue.put(deployment_state.add_log({'type': 'pods', 'message': '📦 Pod Status:'}))
+                for line in list(pods.values())[-15:]:  # Limit to the 15 most recent pods
+                    output_queue.put(deployment_state.add_log({'type': 'pod', 'message': line}))
+    except Exception as e:
+        logger.debug(f"Pod watch error: {e}")
 
 
 @app.route('/deploy/stream', methods=['POST'])
@@ -553,8 +807,7 @@ def deploy_stream():
     """Handle deployment with real-time log streaming via SSE"""
     def emit_log(log_entry):
         """Helper to emit log and store in global state"""
-        deployment_state.add_log(log_entry)
-        return f"data: {json.dumps(log_entry)}\n\n"
+        return deployment_state.add_log(log_entry)
     
     def generate():
         try:
@@ -575,30 +828,14 @@ def deploy_stream():
 
             # Validate at least one input method provided
             if not api_key and not input_data:
-                yield f"data: {json.dumps({'type': 'error', 'message': 'API key or input data is required'})}\n\n"
+                yield sse_frame({'type': 'error', 'message': 'API key or input data is required'})
                 return
 
             # Check if deployment is already running
             if deployment_state.is_running:
-                yield f"data: {json.dumps({'type': 'info', 'message': 'Deployment already in progress. Connecting to existing logs...'})}\n\n"
+                yield sse_frame({'type': 'info', 'message': 'Deployment already in progress. Connecting to existing logs...'})
                 # Redirect to log streaming
-                existing_logs = deployment_state.get_logs()
-                for log_entry in existing_logs:
-                    yield f"data: {json.dumps(log_entry)}\n\n"
-                # Continue streaming while running
-                last_index = len(existing_logs)
-                while deployment_state.is_running:
-                    yield ": keepalive\n\n"
-                    time.sleep(1)
-                    current_logs = deployment_state.get_logs()
-                    if len(current_logs) > last_index:
-                        for log_entry in current_logs[last_index:]:
-                            yield f"data: {json.dumps(log_entry)}\n\n"
-                        last_index = len(current_logs)
-                # Final logs
-                final_logs = deployment_state.get_logs()
-                for log_entry in final_logs[last_index:]:
-                    yield f"data: {json.dumps(log_entry)}\n\n"
+                yield from follow_logs()
                 return
 
             # Start new deployment
@@ -628,12 +865,13 @@ def deploy_stream():
             namespace = deploy_config.get('namespace', 'nemo')
             input_fields = deploy_config.get('input_fields', [])
 
-            # Prepare environment
-            env = os.environ.copy()
+            # Prepare environment - collect the per-request variables in a small
+            # dict, then build the child environment from it in a single merge
+            overrides = {}
             
             # Handle legacy single API key
             if api_key and env_var:
-                env[env_var] = api_key
+                overrides[env_var] = api_key
             
             # Handle dynamic input fields - map each field to its env var
             if input_fields:
@@ -641,20 +879,23 @@ def deploy_stream():
                     field_id = field.get('id')
                     field_env_var = field.get('env_var')
                     if field_id and field_env_var and field_id in input_data:
-                        env[field_env_var] = input_data[field_id]
+                        overrides[field_env_var] = input_data[field_id]
             
-            env['VERSION'] = version or deploy_config.get('default_version', '')
+            overrides['VERSION'] = version or deploy_config.get('default_version', '')
             # NeMo service URLs
-            env['PLATFORM_URL'] = platform_url
-            env['NIM_PROXY_URL'] = nim_proxy_url
-            env['DATA_STORE_URL'] = data_store_url
+            overrides['PLATFORM_URL'] = platform_url
+            overrides['NIM_PROXY_URL'] = nim_proxy_url
+            overrides['DATA_STORE_URL'] = data_store_url
             # Ingress hostnames  
-            env['INGRESS_HOST'] = ingress_host
-            env['NIM_PROXY_HOST'] = nim_proxy_host
-            env['DATA_STORE_HOST'] = data_store_host
+            overrides['INGRESS_HOST'] = ingress_host
+            overrides['NIM_PROXY_HOST'] = nim_proxy_host
+            overrides['DATA_STORE_HOST'] = data_store_host
+            
+            # Shared by every subprocess of this deployment
+            env = {**os.environ, **overrides}
 
             # Create queue for streaming
-            log_queue = queue.Queue()
+            log_queue = queue.SimpleQueue()
 
             yield emit_log({'type': 'start', 'message': f'Starting {deploy_type} deployment...'})
 
@@ -678,9 +919,10 @@ def deploy_stream():
 
                 # Execute with real-time streaming
                 try:
+                    args, shell = split_command(normalized_cmd)
                     process = subprocess.Popen(
-                        normalized_cmd,
-                        shell=True,
+                        args,
+                        shell=shell,
                         cwd=working_dir,
                         env=env,
                         stdout=subprocess.PIPE,
@@ -744,61 +986,62 @@ def deploy_stream():
             )
             cmd_thread.start()
 
-            # Monitor pods while helm runs
+            # Watch pods while helm runs - one long-lived kubectl stream instead of
+            # a shell + kubectl fork per poll
+            pod_watch = pod_thread = None
+            try:
+                pod_watch = subprocess.Popen(
+                    ["kubectl", "get", "pods", "-n", namespace, "-w", "--output-watch-events", "--no-headers"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    env=env
+                )
+                pod_thread = threading.Thread(target=watch_pods_async, args=(pod_watch, log_queue), daemon=True)
+                pod_thread.start()
+            except Exception as e:
+                logger.debug(f"Pod watch unavailable: {e}")
+
             poll_interval = 5
-            last_pod_status = ""
             polls_without_change = 0
             max_monitor_time = 900  # 15 minutes max monitoring
             start_time = time.time()
+            next_poll = start_time
             timed_out = False
 
-            while not result_holder['done'] or polls_without_change < 2:
-                # Send keepalive comment (SSE spec: lines starting with : are comments)
-                yield ": keepalive\n\n"
-                
-                # Drain any output from the command
-                while not log_queue.empty():
-                    try:
-                        msg_type, msg = log_queue.get_nowait()
-                        yield emit_log({'type': msg_type, 'message': msg})
-                    except:
-                        break
-
-                # Check if command is done
-                if result_holder['done']:
-                    polls_without_change += 1
-                    if polls_without_change >= 2:
+            try:
+                while True:
+                    # Until the next status check is due, block on the queue and forward
+                    # command and pod output as soon as it arrives
+                    wait = next_poll - time.time()
+                    if wait > 0:
+                        try:
+                            yield log_queue.get(timeout=wait)
+                            continue
+                        except queue.Empty:
+                            pass
+                    next_poll = time.time() + poll_interval
+
+                    # Send keepalive comment (SSE spec: lines starting with : are comments)
+                    yield KEEPALIVE
+
+                    # Check if command is done
+                    if result_holder['done']:
+                        polls_without_change += 1
+                        if polls_without_change >= 2:
+                            break
+
+                    # Timeout check
+                    if time.time() - start_time > max_monitor_time:
+                        yield emit_log({'type': 'info', 'message': 'Monitoring timeout reached (15 min). Helm may still be running in background.'})
+                        yield emit_log({'type': 'info', 'message': 'Check status with: kubectl get pods -n nemo'})
+                        timed_out = True
                         break
-
-                # Poll pod status
-                try:
-                    pod_result = subprocess.run(
-                        f"kubectl get pods -n {namespace} --no-headers 2>/dev/null | head -20",
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        timeout=10,
-                        env=env
-                    )
-                    pod_status = pod_result.stdout.strip()
-                    
-                    if pod_status and pod_status != last_pod_status:
-                        yield emit_log({'type': 'pods', 'message': '📦 Pod Status:'})
-                        for line in pod_status.split('\n')[:15]:  # Limit to 15 pods
-                            if line.strip():
-                                yield emit_log({'type': 'pod', 'message': line})
-                        last_pod_status = pod_status
-                except Exception as e:
-                    logger.debug(f"Pod poll error: {e}")
-
-                # Timeout check
-                if time.time() - start_time > max_monitor_time:
-                    yield emit_log({'type': 'info', 'message': 'Monitoring timeout reached (15 min). Helm may still be running in background.'})
-                    yield emit_log({'type': 'info', 'message': 'Check status with: kubectl get pods -n nemo'})
-                    timed_out = True
-                    break
-
-                time.sleep(poll_interval)
+            finally:
+                if pod_watch:
+                    pod_watch.kill()
+                    pod_watch.wait()
+                if pod_thread:
+                    pod_thread.join(timeout=1)
 
             # Wait for thread to complete (longer timeout if we didn't timeout on monitoring)
             if not timed_out:
@@ -807,12 +1050,11 @@ def deploy_stream():
                 cmd_thread.join(timeout=5)  # Brief wait if we already timed out
 
             # Final drain of output
-            while not log_queue.empty():
-                try:
-                    msg_type, msg = log_queue.get_nowait()
-                    yield emit_log({'type': msg_type, 'message': msg})
-                except:
-                    break
+            try:
+                while True:
+                    yield log_queue.get_nowait()
+            except queue.Empty:
+                pass
 
             # Report final status
             if timed_out and result_holder['returncode'] is None:
@@ -836,9 +1078,10 @@ def deploy_stream():
                         
                         # Execute with real-time streaming
                         try:
+                            args, shell = split_command(normalized_post)
                             process = subprocess.Popen(
-                                normalized_post,
-                                shell=True,
+                                args,
+                                shell=shell,
                                 cwd=working_dir,
                                 env=env,
                                 stdout=subprocess.PIPE,
@@ -920,7 +1163,13 @@ def deploy_stream():
             yield emit_log({'type': 'error', 'message': f'Error: {str(e)}'})
             deployment_state.finish('failed')
 
-    return Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Frames are pre-encoded bytes, so hand them to the server as-is
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers=SSE_HEADERS,
+        direct_passthrough=True
+    )
 
 @app.route('/deploy', methods=['POST'])
 def deploy():
@@ -127,9 +127,12 @@ fi
 echo "   ✓ nginx config OK"
 
 # Start Flask FIRST (internal, not exposed directly)
+# Single gevent worker: deployment state lives in-process, and each SSE log
+# subscriber costs a greenlet instead of a thread
 echo "🚀 Starting Flask SPA on :8080 (internal)..."
 cd /app
-python app.py &
+gunicorn --worker-class gevent --workers 1 --worker-connections 1000 \
+    --bind 0.0.0.0:8080 app:app &
 FLASK_PID=$!
 
 # Wait for Flask to be ready